@@ -1,9 +1,41 @@
 import os
 import argparse
 import fnmatch
+import functools
 import time
 import sys
 import re
+import shutil
+import codecs
+import collections
+import itertools
+import operator
+import concurrent.futures
+
+_DIGIT_RE = re.compile(r'\d{5,}').search
+_GLOB_CHARS = re.compile(r'[*?[]')
+_BY_NAME = operator.attrgetter('name')
+_SYMLINK = object()  # Stack marker for a symlinked directory
+
+_RULE = b"=" * 60 + b"\n"
+_DASHES = b"-" * 60 + b"\n"
+_EXCLUSION_RULES = ("=== EXCLUSION RULES APPLIED ===\n"
+                    "✓ Files and directories from .gitignore\n"
+                    "✓ Directories starting with '.'\n"
+                    "✓ Files with 5+ consecutive digits in filename\n"
+                    "✓ Files and directories with 'cache' in name\n").encode('utf-8')
+
+_SNIFF_SIZE = 8192  # Bytes inspected when detecting binary files
+_UTF8_DECODER = codecs.getincrementaldecoder('utf-8')
+_COPY_CHUNK = 1024 * 1024
+_OUTPUT_BUFFER = 1024 * 1024  # Lets many small files share one write syscall
+_USE_SENDFILE = sys.platform.startswith('linux') and hasattr(os, 'sendfile')
+_INLINE_LIMIT = 1024 * 1024  # Larger files are streamed by the writer instead of read whole
+_READ_WORKERS = 16
+_READ_BATCH = 256 * 1024  # Bytes of files handed to a worker at once
+_READ_BATCH_FILES = 64
+_READ_WINDOW = 2 * _READ_WORKERS  # Batches read ahead of the one being written
+_PROGRESS_INTERVAL = 0.1  # Seconds between updates of the progress line
 
 def read_gitignore(directory):
     gitignore_path = os.path.join(directory, '.gitignore')
@@ -16,300 +48,514 @@ def read_gitignore(directory):
                     patterns.append(stripped)
     return patterns
 
-def is_ignored(path, patterns, root, output_file, extensions):
-    # Check if the path is the output file itself
-    if os.path.abspath(path) == os.path.abspath(output_file):
+def compile_patterns(patterns):
+    """Compile gitignore patterns into a ``(names, regex, component_ignored)`` matcher.
+
+    Patterns are cleaned once here and split by how cheaply they can be
+    tested: literal names go into a frozenset, ``*<literal>`` patterns such
+    as ``*.log`` into a suffix tuple for str.endswith, and the remaining
+    globs are translated into one alternation regex (None if there are
+    none). ``component_ignored`` tests a single path component against all
+    of them. Returns None when there is nothing to match.
+    """
+    names = set()
+    suffixes = []
+    translated = []
+    for pattern in patterns:
+        if pattern.startswith('/'):
+            pattern = pattern[1:]
+        if pattern.endswith('/'):
+            pattern = pattern[:-1]
+        if not pattern:
+            continue
+        pattern = os.path.normcase(pattern)
+        if not _GLOB_CHARS.search(pattern):
+            names.add(pattern)
+        elif (pattern.startswith('*') and os.sep not in pattern
+              and not _GLOB_CHARS.search(pattern, 1)):
+            suffixes.append(pattern[1:])
+        else:
+            translated.append(fnmatch.translate(pattern))
+    if not (names or suffixes or translated):
+        return None
+    names = frozenset(names)
+    suffixes = tuple(suffixes)
+    regex = re.compile('|'.join(translated)) if translated else None
+
+    @functools.lru_cache(maxsize=None)
+    def component_ignored(part):
+        """Return whether a single path component matches the patterns.
+
+        Every entry re-tests the names of all its parent directories, so
+        results are cached per name. process_directory clears the cache
+        after traversal.
+        """
+        if part in names or part.endswith(suffixes):
+            return True
+        return regex is not None and regex.match(part) is not None
+
+    return names, regex, component_ignored
+
+def is_ignored(path, relative_path, is_dir, patterns, output_file, extensions):
+    """Return whether an entry should be left out of the output.
+
+    The checks run cheapest first, so most entries are decided before the
+    pattern regex is consulted.
+    """
+    # Check if the path is the output file itself. Paths are built under the
+    # absolute root and output_file is absolute, so plain equality suffices.
+    if path == output_file:
         return True
         
     # Get the basename of the path
     basename = os.path.basename(path)
     
     # Exclude directories that start with '.'
-    if os.path.isdir(path) and basename.startswith('.'):
+    if is_dir and basename.startswith('.'):
         return True
         
     # Exclude files and folders with "cache" in their name (case insensitive)
     if 'cache' in basename.lower():
         return True
         
-    # Exclude files with more than 4 consecutive digits
-    if os.path.isfile(path):
-        if re.search(r'\d{5,}', basename):  # 5 or more consecutive digits
-            return True
+    if not is_dir:
+        # Check if the file extension is not in the set of extensions to include
+        if extensions:
+            _, file_extension = os.path.splitext(basename)
+            if file_extension[1:].lower() not in extensions:
+                return True
             
-    # Check if the path matches any of the patterns
-    for pattern in patterns:
-        if pattern.startswith('/'):
-            pattern = pattern[1:]
-        if pattern.endswith('/'):
-            pattern = pattern[:-1]
-        if fnmatch.fnmatch(path, os.path.join(root, pattern)) or fnmatch.fnmatch(os.path.relpath(path, root), pattern):
+        # Exclude files with more than 4 consecutive digits. Names shorter
+        # than five characters cannot match, so they skip the regex.
+        if len(basename) >= 5 and _DIGIT_RE(basename):  # 5 or more consecutive digits
             return True
-        if os.path.isdir(path) and fnmatch.fnmatch(path, os.path.join(root, pattern + '/*')):
-            return True
-        if any(fnmatch.fnmatch(part, pattern) for part in os.path.relpath(path, root).split(os.sep)):
+            
+    # Check if the path matches any of the patterns, the most expensive test
+    if patterns is not None:
+        names, regex, component_ignored = patterns
+        relative_path = os.path.normcase(relative_path)
+        if relative_path in names or (regex is not None and regex.match(relative_path)):
             return True
-    # Check if the file extension is not in the list of extensions to include
-    if os.path.isfile(path):
-        _, file_extension = os.path.splitext(path)
-        if extensions and file_extension[1:].lower() not in extensions:
+        # A suffix matching the whole path also matches its last component.
+        # map() drives the cached check from C, without a generator frame.
+        if any(map(component_ignored, relative_path.split(os.sep))):
             return True
     return False
 
-def get_directory_structure(directory, patterns, root_dir, output_file, extensions, indent=''):
-    """Generate a string representation of the directory structure."""
+def _scan(directory):
+    """List a directory once, returning sorted (dirs, files) DirEntry lists.
+
+    DirEntry caches the file type (and, once requested, the stat result) from
+    the directory read, so callers should use it instead of os.path helpers.
+    Symlinks to directories are returned in dirs; callers must check
+    is_symlink() and not descend into them. Entries whose type cannot be
+    determined, such as looping or unreadable links, are left out, as
+    os.path.isdir and os.path.isfile would report neither.
+    """
+    dirs = []
+    files = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            try:
+                if entry.is_dir():
+                    dirs.append(entry)
+                elif entry.is_file():
+                    files.append(entry)
+            except OSError:
+                continue
+    dirs.sort(key=_BY_NAME)
+    files.sort(key=_BY_NAME)
+    return dirs, files
+
+def get_directory_structure(directory, patterns, output_file, extensions, included):
+    """Generate a string representation of the directory structure.
+
+    ``directory`` is the project root: relative paths are relative to it and
+    the statistics block at the end covers every file below it.
+
+    Returns the lines, UTF-8 encoded and newline-terminated, ready to be
+    written out; the file counts they show are gathered during the same
+    traversal. Each included file is also appended to ``included`` as a
+    ``(relative_path, entry)`` pair, in the order it appears in the structure.
+    """
     result = []
+    indents = ['']  # indents[depth] is the prefix for lines at that depth
     
-    try:
-        items = sorted(os.listdir(directory))
-        dirs = [item for item in items if os.path.isdir(os.path.join(directory, item))]
-        files = [item for item in items if os.path.isfile(os.path.join(directory, item))]
-        
-        # Count included and excluded items for statistics
-        included_dirs = 0
-        excluded_dirs = 0
-        included_files = 0
-        excluded_files = 0
-        
-        for d in dirs:
-            path = os.path.join(directory, d)
-            if not is_ignored(path, patterns, root_dir, output_file, extensions):
-                included_dirs += 1
-                
-                # Add file count indicator
-                file_count = count_files(path, patterns, root_dir, output_file, extensions)
-                dir_text = f"{indent}📁 {d}/ ({file_count} files)"
-                
-                result.append(dir_text)
-                result.extend(get_directory_structure(path, patterns, root_dir, output_file, extensions, indent + '│  '))
-            else:
-                excluded_dirs += 1
+    # Each node is [included, excluded, parent node, index of its line, name].
+    # A directory's line is reserved when it is reached and filled in once all
+    # of its files have been counted.
+    root = [0, 0, None, None, None]
+    
+    # Stack entries are (path, relative path, depth, node, files). Ignored
+    # directories are never pushed, so their subtrees are pruned without being
+    # listed. A directory is first pushed with files=None to be listed. Listing
+    # pushes it back with its files below its subdirectories, so the files are
+    # emitted after the subdirectories.
+    stack = [(directory, '', 0, root, None)]
+    
+    # Bind the names used for every entry to locals, which are the cheapest
+    # lookups the interpreter does
+    append = result.append
+    push = stack.append
+    add_included = included.append
+    ignored = is_ignored
+    splitext = os.path.splitext
+    
+    while stack:
+        path, rel_dir, depth, node, files = stack.pop()
+        if files is _SYMLINK:
+            # Listed in place, but not followed, so links cannot loop the walk
+            append(f"{indents[depth - 1]}🔗 {os.path.basename(path)}/ (symlink, not followed)\n".encode('utf-8'))
+            continue
+        prefix = rel_dir + os.sep if rel_dir else ''
+        listing = files is None
+        if depth == len(indents):
+            indents.append(indents[-1] + '│  ')
+        indent = indents[depth]
         
-        for f in files:
-            path = os.path.join(directory, f)
-            if not is_ignored(path, patterns, root_dir, output_file, extensions):
-                included_files += 1
+        try:
+            if listing:
+                if node[2] is not None:
+                    node[3] = len(result)
+                    append(None)
                 
-                # Add file size indicator
-                size = os.path.getsize(path)
-                size_str = format_file_size(size)
-                file_text = f"{indent}📄 {f} ({size_str})"
+                files = []
+                push((path, rel_dir, depth, node, files))
+                dirs, scanned = _scan(path)
+                files.extend(scanned)
                 
-                # Add a visual indicator for file type
-                _, ext = os.path.splitext(f)
-                if ext:
-                    ext = ext[1:].lower()  # Remove the dot and convert to lowercase
-                    icon = get_file_icon(ext)
-                    file_text = f"{indent}{icon} {f} ({size_str})"
-                
-                result.append(file_text)
+                for d in reversed(dirs):
+                    rel = prefix + d.name
+                    if not ignored(d.path, rel, True, patterns, output_file, extensions):
+                        if d.is_symlink():
+                            push((d.path, rel, depth + 1, None, _SYMLINK))
+                        else:
+                            push((d.path, rel, depth + 1, [0, 0, node, None, d.name], None))
             else:
-                excluded_files += 1
+                for f in files:
+                    rel = prefix + f.name
+                    if not ignored(f.path, rel, False, patterns, output_file, extensions):
+                        # Stat first, so a file that vanished since listing is
+                        # reported on its own line, neither counted nor queued
+                        try:
+                            size_str = format_file_size(f.stat().st_size)
+                        except OSError as e:
+                            append(f"{indent}❌ Error: {str(e)}\n".encode('utf-8'))
+                            continue
+                        node[0] += 1
+                        add_included((rel, f))
+                        
+                        # Add a visual indicator for file type
+                        _, ext = splitext(f.name)
+                        icon = get_file_icon(ext[1:].lower()) if ext else '📄'
+                        append(f"{indent}{icon} {f.name} ({size_str})\n".encode('utf-8'))
+                    else:
+                        node[1] += 1
+                        
+        except PermissionError:
+            result.append(f"{indent}🔒 Permission denied\n".encode('utf-8'))
+        except Exception as e:
+            result.append(f"{indent}❌ Error: {str(e)}\n".encode('utf-8'))
         
-        # If this is the root directory, add statistics
-        if directory == root_dir:
-            total_included = count_files(directory, patterns, root_dir, output_file, extensions)
-            total_excluded = count_excluded_files(directory, patterns, root_dir, output_file, extensions)
-            
-            result.append("")
-            result.append("📊 STATISTICS:")
-            result.append(f"   Total files included: {total_included}")
-            result.append(f"   Total files excluded: {total_excluded}")
-            result.append(f"   Total files: {total_included + total_excluded}")
-            
-    except PermissionError:
-        result.append(f"{indent}🔒 Permission denied")
-    except Exception as e:
-        result.append(f"{indent}❌ Error: {str(e)}")
+        if not listing:
+            # Every subdirectory is done, so the counts are final
+            included_files, excluded_files, parent, line_index, name = node
+            if parent is not None:
+                # Add file count indicator
+                result[line_index] = f"{indents[depth - 1]}📁 {name}/ ({included_files} files)\n".encode('utf-8')
+                parent[0] += included_files
+                parent[1] += excluded_files
+    
+    # Add statistics for the whole project
+    included_files, excluded_files = root[0], root[1]
+    result.append((f"\n📊 STATISTICS:\n"
+                   f"   Total files included: {included_files}\n"
+                   f"   Total files excluded: {excluded_files}\n"
+                   f"   Total files: {included_files + excluded_files}\n").encode('utf-8'))
     
     return result
 
-def count_files(directory, patterns, root_dir, output_file, extensions):
-    """Count the number of files that would be included in the output."""
-    count = 0
-    for root, dirs, files in os.walk(directory):
-        # Filter out ignored directories
-        dirs[:] = [d for d in dirs if not is_ignored(os.path.join(root, d), patterns, root_dir, output_file, extensions)]
-        
-        # Count non-ignored files
-        for file in files:
-            file_path = os.path.join(root, file)
-            if not is_ignored(file_path, patterns, root_dir, output_file, extensions):
-                count += 1
-    return count
-
-def count_excluded_files(directory, patterns, root_dir, output_file, extensions):
-    """Count the number of files that would be excluded from the output."""
-    count = 0
-    for root, dirs, files in os.walk(directory):
-        # Count ignored directories
-        excluded_dirs = []
-        for d in dirs:
-            if is_ignored(os.path.join(root, d), patterns, root_dir, output_file, extensions):
-                excluded_dirs.append(d)
-                
-        # Remove excluded directories from dirs to avoid walking them
-        for d in excluded_dirs:
-            dirs.remove(d)
-        
-        # Count ignored files
-        for file in files:
-            file_path = os.path.join(root, file)
-            if is_ignored(file_path, patterns, root_dir, output_file, extensions):
-                count += 1
-    return count
-
 def format_file_size(size_in_bytes):
     """Convert file size in bytes to a human-readable format."""
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size_in_bytes < 1024.0:
-            return f"{size_in_bytes:.1f} {unit}"
-        size_in_bytes /= 1024.0
-    return f"{size_in_bytes:.1f} TB"
+    if size_in_bytes < 1024:
+        return f"{size_in_bytes:.1f} B"
+    if size_in_bytes < 1024 ** 2:
+        return f"{size_in_bytes / 1024:.1f} KB"
+    if size_in_bytes < 1024 ** 3:
+        return f"{size_in_bytes / 1024 ** 2:.1f} MB"
+    if size_in_bytes < 1024 ** 4:
+        return f"{size_in_bytes / 1024 ** 3:.1f} GB"
+    return f"{size_in_bytes / 1024 ** 4:.1f} TB"
+
+_FILE_ICONS = {
+    # Code
+    'py': '🐍',
+    'js': '📜',
+    'ts': '📜',
+    'jsx': '⚛️',
+    'tsx': '⚛️',
+    'html': '🌐',
+    'css': '🎨',
+    'scss': '🎨',
+    'sass': '🎨',
+    'java': '☕',
+    'c': '📟',
+    'cpp': '📟',
+    'h': '📟',
+    'cs': '📟',
+    'php': '🐘',
+    'rb': '💎',
+    'go': '🔹',
+    'rs': '🦀',
+    'swift': '🔶',
+    'kt': '🔷',
+    
+    # Data
+    'json': '📊',
+    'xml': '📊',
+    'csv': '📊',
+    'yaml': '📊',
+    'yml': '📊',
+    'toml': '📊',
+    'sql': '🗃️',
+    
+    # Documents
+    'md': '📝',
+    'txt': '📄',
+    'pdf': '📑',
+    'doc': '📘',
+    'docx': '📘',
+    'xls': '📗',
+    'xlsx': '📗',
+    'ppt': '📙',
+    'pptx': '📙',
+    
+    # Images
+    'jpg': '🖼️',
+    'jpeg': '🖼️',
+    'png': '🖼️',
+    'gif': '🖼️',
+    'svg': '🖼️',
+    'ico': '🖼️',
+    'webp': '🖼️',
+    
+    # Archives
+    'zip': '📦',
+    'rar': '📦',
+    'tar': '📦',
+    'gz': '📦',
+    '7z': '📦',
+    
+    # Config
+    'ini': '⚙️',
+    'conf': '⚙️',
+    'config': '⚙️',
+    'env': '⚙️',
+    
+    # Executable
+    'exe': '⚡',
+    'sh': '⚡',
+    'bat': '⚡',
+    'cmd': '⚡',
+}
 
 def get_file_icon(extension):
     """Return an appropriate icon for the file type."""
-    icons = {
-        # Code
-        'py': '🐍',
-        'js': '📜',
-        'ts': '📜',
-        'jsx': '⚛️',
-        'tsx': '⚛️',
-        'html': '🌐',
-        'css': '🎨',
-        'scss': '🎨',
-        'sass': '🎨',
-        'java': '☕',
-        'c': '📟',
-        'cpp': '📟',
-        'h': '📟',
-        'cs': '📟',
-        'php': '🐘',
-        'rb': '💎',
-        'go': '🔹',
-        'rs': '🦀',
-        'swift': '🔶',
-        'kt': '🔷',
-        
-        # Data
-        'json': '📊',
-        'xml': '📊',
-        'csv': '📊',
-        'yaml': '📊',
-        'yml': '📊',
-        'toml': '📊',
-        'sql': '🗃️',
-        
-        # Documents
-        'md': '📝',
-        'txt': '📄',
-        'pdf': '📑',
-        'doc': '📘',
-        'docx': '📘',
-        'xls': '📗',
-        'xlsx': '📗',
-        'ppt': '📙',
-        'pptx': '📙',
-        
-        # Images
-        'jpg': '🖼️',
-        'jpeg': '🖼️',
-        'png': '🖼️',
-        'gif': '🖼️',
-        'svg': '🖼️',
-        'ico': '🖼️',
-        'webp': '🖼️',
-        
-        # Archives
-        'zip': '📦',
-        'rar': '📦',
-        'tar': '📦',
-        'gz': '📦',
-        '7z': '📦',
-        
-        # Config
-        'ini': '⚙️',
-        'conf': '⚙️',
-        'config': '⚙️',
-        'env': '⚙️',
+    return _FILE_ICONS.get(extension, '📄')  # Default icon if extension not found
+
+def _read_error(header, relative_path, error):
+    """Build the read_file result reporting that a file could not be read."""
+    return (header + f"[Error reading file: {str(error)}]\n\n".encode('utf-8'), None,
+            f"Error processing file: {relative_path} ({str(error)})")
+
+@functools.lru_cache(maxsize=4096)
+def format_mtime(seconds):
+    """Format a modification time given in whole seconds.
+
+    Files in a checkout mostly share a handful of mtimes, so the formatted
+    strings are cached rather than built again for every file.
+    """
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(seconds))
+
+def read_file(relative_path, entry):
+    """Read the file behind a DirEntry for the output. Runs on a worker thread.
+
+    Returns ``(chunk, infile, message)``. ``chunk`` is the header and, for
+    files up to _INLINE_LIMIT, the whole body. For larger files ``infile`` is
+    left open after the bytes already in ``chunk`` so the writer can stream
+    the rest; otherwise it is None. ``message`` is a line to print, or None.
+    """
+    # Get file metadata from the stat result cached while listing the tree
+    try:
+        st = entry.stat()
+    except Exception as e:
+        return _read_error(f"=== {relative_path} ===\n".encode('utf-8') + _DASHES, relative_path, e)
+    file_size = format_file_size(st.st_size)
+    file_mod_time = format_mtime(st.st_mtime_ns // 1000000000)
+
+    # Build header with file information
+    header = (f"=== {relative_path} ===\n"
+              f"Size: {file_size} | Last Modified: {file_mod_time}\n").encode('utf-8') + _DASHES
+
+    try:
+        infile = open(entry.path, 'rb')
+    except Exception as e:
+        return _read_error(header, relative_path, e)
+    try:
+        # A NUL byte near the start marks the file as binary
+        sniff = infile.read(_SNIFF_SIZE)
+        if b'\0' in sniff:
+            infile.close()
+            return (header + b"[Binary file - contents not displayed]\n\n", None,
+                    f"Skipping file: {relative_path} (binary file)")
         
-        # Executable
-        'exe': '⚡',
-        'sh': '⚡',
-        'bat': '⚡',
-        'cmd': '⚡',
-    }
-    
-    return icons.get(extension, '📄')  # Default icon if extension not found
+        # Validate the prefix as UTF-8 without keeping the decoded text. The
+        # incremental decoder tolerates a character cut at the sniff boundary.
+        try:
+            _UTF8_DECODER().decode(sniff, len(sniff) < _SNIFF_SIZE)
+        except UnicodeDecodeError:
+            infile.close()
+            return (header + b"[Binary file - contents not displayed]\n\n", None,
+                    f"Skipping file: {relative_path} (Unicode decode error)")
+        body = sniff + infile.read(_INLINE_LIMIT - len(sniff))
+    except Exception as e:
+        infile.close()
+        return _read_error(header, relative_path, e)
+    if len(body) < _INLINE_LIMIT:
+        infile.close()
+        # One join copies the body once; the separator goes between files
+        return b''.join((header, body, b"\n\n")), None, None
+    return header + body, infile, None
+
+def read_batch(batch):
+    """Run read_file over a list of ``(relative_path, entry)`` pairs."""
+    return [read_file(relative_path, entry) for relative_path, entry in batch]
+
+def batch_files(included):
+    """Group included files into runs of up to _READ_BATCH bytes to read.
+
+    Small files are far cheaper to read than a pool future costs to submit
+    and resolve, so each worker is handed a run of them instead of just one.
+    A file counts for at most _INLINE_LIMIT, the most read_file loads of it.
+    """
+    batch = []
+    size = 0
+    for item in included:
+        try:
+            size += min(item[1].stat().st_size, _INLINE_LIMIT)
+        except OSError:
+            pass  # read_file reports the error when it gets to the file
+        batch.append(item)
+        if size >= _READ_BATCH or len(batch) >= _READ_BATCH_FILES:
+            yield (batch,)
+            batch = []
+            size = 0
+    if batch:
+        yield (batch,)
+
+def map_ahead(executor, fn, items, depth):
+    """Like Executor.map, but with at most ``depth`` calls in flight.
+
+    Results are yielded in submission order. Bounding the window keeps memory
+    and open files limited however far the workers get ahead of the caller.
+    """
+    pending = collections.deque()
+    for args in items:
+        pending.append(executor.submit(fn, *args))
+        if len(pending) >= depth:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def copy_file_body(infile, outfile):
+    """Copy the rest of ``infile`` to ``outfile`` as raw bytes.
+
+    On Linux the copy is done in the kernel with os.sendfile; elsewhere, or
+    if the file system refuses sendfile, shutil.copyfileobj is used.
+    """
+    if _USE_SENDFILE:
+        outfile.flush()  # sendfile writes straight to the descriptor
+        in_fd, out_fd = infile.fileno(), outfile.fileno()
+        offset = start = infile.tell()
+        try:
+            while True:
+                sent = os.sendfile(out_fd, in_fd, offset, _COPY_CHUNK)
+                if not sent:
+                    return
+                offset += sent
+        except OSError:
+            if offset != start:
+                raise
+        infile.seek(start)
+    shutil.copyfileobj(infile, outfile, _COPY_CHUNK)
 
 def process_directory(directory, output_file, extensions):
     patterns = read_gitignore(directory)
     patterns.append('.git/')  # Skip .git folder files
+    patterns = compile_patterns(patterns)
+    
+    # Entry paths are joined onto the absolute root during traversal, so the
+    # output file can be recognized by string equality with its absolute path
+    root = os.path.abspath(directory)
+    output_file = os.path.abspath(output_file)
 
-    with open(output_file, 'w', encoding='utf-8') as outfile:
+    with open(output_file, 'wb', buffering=_OUTPUT_BUFFER) as outfile:
         # Write directory structure at the beginning
-        outfile.write("=" * 60 + "\n")
-        outfile.write("=== PROJECT DIRECTORY STRUCTURE ===\n")
-        outfile.write("=" * 60 + "\n\n")
+        outfile.write(_RULE)
+        outfile.write(b"=== PROJECT DIRECTORY STRUCTURE ===\n")
+        outfile.write(_RULE + b"\n")
         
         # Get the project name from the directory
         project_name = os.path.basename(os.path.normpath(directory))
-        outfile.write(f"📂 PROJECT: {project_name}\n")
-        outfile.write(f"📅 DATE: {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+        outfile.write(f"📂 PROJECT: {project_name}\n".encode('utf-8'))
+        outfile.write(f"📅 DATE: {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n".encode('utf-8'))
         
-        structure = get_directory_structure(directory, patterns, directory, output_file, extensions)
-        outfile.write('\n'.join(structure))
-        outfile.write("\n\n")
-        outfile.write("=" * 60 + "\n\n")
+        included = []
+        structure = get_directory_structure(root, patterns, output_file, extensions, included)
+        if patterns is not None:
+            _, _, component_ignored = patterns
+            component_ignored.cache_clear()  # Only needed for the traversal
+        outfile.writelines(structure)
+        outfile.write(b"\n")
+        outfile.write(_RULE + b"\n")
         
         # Write file exclusion rules applied
-        outfile.write("=== EXCLUSION RULES APPLIED ===\n")
-        outfile.write("✓ Files and directories from .gitignore\n")
-        outfile.write("✓ Directories starting with '.'\n")
-        outfile.write("✓ Files with 5+ consecutive digits in filename\n")
-        outfile.write("✓ Files and directories with 'cache' in name\n")
+        outfile.write(_EXCLUSION_RULES)
         if extensions:
-            outfile.write(f"✓ Only including extensions: {', '.join(extensions)}\n")
-        outfile.write("\n")
-        outfile.write("=" * 60 + "\n\n")
+            outfile.write(f"✓ Only including extensions: {', '.join(sorted(extensions))}\n".encode('utf-8'))
+        outfile.write(b"\n")
+        outfile.write(_RULE + b"\n")
 
-        for root, dirs, files in os.walk(directory):
-            # Remove ignored directories from dirs
-            dirs[:] = [d for d in dirs if not is_ignored(os.path.join(root, d), patterns, directory, output_file, extensions)]
+        # Write file contents in the order they were listed in the structure
+        # Files are read in batches on a thread pool so their disk reads
+        # overlap, but written one at a time in order, keeping the output
+        # deterministic
+        output_name = os.path.basename(output_file)
+        show_progress = sys.stdout.isatty()
+        last_tick = 0.0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=_READ_WORKERS) as executor:
+            batches = map_ahead(executor, read_batch, batch_files(included), _READ_WINDOW)
+            results = itertools.chain.from_iterable(batches)
+            for (relative_path, _), (chunk, infile, message) in zip(included, results):
+                if message:
+                    print(message)
+                outfile.write(chunk)
+                if infile is not None:
+                    with infile:
+                        try:
+                            copy_file_body(infile, outfile)
+                            outfile.write(b"\n\n")  # Add a separator between files
+                        except Exception as e:
+                            print(f"Error processing file: {relative_path} ({str(e)})")
+                            outfile.write(f"[Error reading file: {str(e)}]\n\n".encode('utf-8'))
 
-            for file in files:
-                file_path = os.path.join(root, file)
-                if is_ignored(file_path, patterns, directory, output_file, extensions):
-                    continue
-
-                # Get the relative path to the input directory
-                relative_path = os.path.relpath(file_path, directory)
-                
-                # Get file metadata
-                file_size = format_file_size(os.path.getsize(file_path))
-                file_mod_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(os.path.getmtime(file_path)))
-
-                # Write header with file information
-                outfile.write(f"=== {relative_path} ===\n")
-                outfile.write(f"Size: {file_size} | Last Modified: {file_mod_time}\n")
-                outfile.write("-" * 60 + "\n")
-
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as infile:
-                        content = infile.read()
-                        outfile.write(content)
-                        outfile.write("\n\n")  # Add a separator between files
-                except UnicodeDecodeError:
-                    print(f"Skipping file: {relative_path} (Unicode decode error)")
-                    outfile.write("[Binary file - contents not displayed]\n\n")
-                except Exception as e:
-                    print(f"Error processing file: {relative_path} ({str(e)})")
-                    outfile.write(f"[Error reading file: {str(e)}]\n\n")
-
-            # Update the animated text
-            sys.stdout.write(f"\rMerging into {os.path.basename(output_file)}{'.' * (int(time.time()) % 4)}")
-            sys.stdout.flush()
+                # Update the animated text, at most 10 times a second
+                if show_progress:
+                    now = time.monotonic()
+                    if now - last_tick >= _PROGRESS_INTERVAL:
+                        last_tick = now
+                        sys.stdout.write(f"\rMerging into {output_name}{'.' * (int(time.time()) % 4)}")
+                        sys.stdout.flush()
 
 def main():
     parser = argparse.ArgumentParser(description='Combine code files into a continuous text file.')
@@ -318,7 +564,7 @@ def main():
     parser.add_argument('-e', '--extensions', help='Comma-separated list of file extensions to include', default='')
     args = parser.parse_args()
 
-    extensions = [ext.lower() for ext in args.extensions.split(',')] if args.extensions else []
+    extensions = frozenset(ext.lower() for ext in args.extensions.split(',')) if args.extensions else frozenset()
 
     # Resolve the actual path of the directory
     directory_path = os.path.realpath(args.directory)